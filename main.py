@@ -3,6 +3,9 @@
 SONY RC-S300 NFCカードリーダー用のRESTful APIを提供する。
 """
 
+import asyncio
+import csv
+import json
 import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -17,38 +20,68 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.middleware.gzip import GZipMiddleware
 
 from src.api.routes import router
 from src.config.settings import get_settings
-from src.logging.logger import get_logger
-from src.services.user_service import _ensure_csv_file
+from src.logging.logger import get_logger, start_log_listener, stop_log_listener
+from src.nfc.reader import get_nfc_reader
+from src.services.user_service import get_all_users
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Uvicorn設定（uvloopはWindows非対応のため、Windowsでは標準のasyncioを使用）
+UVICORN_LOOP = "asyncio" if sys.platform == "win32" else "uvloop"
+UVICORN_HTTP = "httptools"
+
+# この値（バイト）以上のレスポンスをgzip圧縮する
+GZIP_MINIMUM_SIZE = 500
+
+# ヘルスチェックのレスポンスボディ（毎回のJSONエンコードを避けるため事前生成）
+HEALTH_CHECK_BODY = json.dumps(
+    {"status": "ok", "message": "NFC Card Reader Backend API is running"}
+).encode("utf-8")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """アプリケーションのライフサイクル管理。"""
     # 起動時の処理
+    start_log_listener()
     logger.info("Application starting...")
-    _ensure_csv_file()
+    # ユーザー索引を先に構築し、初回リクエストでCSVを読み込まないようにする
+    # CSVの読み込みに失敗してもNFC機能は使えるよう起動は継続し、
+    # 索引は初回アクセス時に読み込む（UnicodeDecodeErrorはValueErrorに含まれる）
+    try:
+        users = await asyncio.to_thread(get_all_users)
+        logger.info(f"User index loaded: {len(users)} users")
+    except (OSError, ValueError, csv.Error) as e:
+        logger.warning(f"Failed to preload user index: {e}")
+    # 複数ワーカー構成ではリーダーを1プロセスだけが扱う
+    if get_nfc_reader().acquire_device():
+        logger.info("NFC reader is handled by this process")
+    else:
+        logger.info("NFC reader is handled by another worker process")
     logger.info("Application started successfully")
 
     yield
 
     # 終了時の処理
     logger.info("Application shutting down...")
-    from src.nfc.reader import get_nfc_reader
-
     reader = get_nfc_reader()
     if reader.is_continuous_mode_running():
         reader.stop_continuous_mode()
+    reader.close()
     logger.info("Application shutdown complete")
+    stop_log_listener()
 
 
 # FastAPIアプリケーション
+# レスポンスモデルを持つエンドポイントは、Pydantic（Rust実装）が
+# 直接JSONバイト列にシリアライズする（FastAPI 0.130以降）。
+# default_response_classを変更するとこの高速経路が無効になるため指定しない。
 app = FastAPI(
     title="NFC Card Reader Backend API",
     description="SONY RC-S300 NFCカードリーダー用バックエンドAPI",
@@ -56,24 +89,37 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# レスポンス圧縮（クライアントがgzipに対応している場合のみ適用）
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # ルーター登録
 app.include_router(router)
 
 
 @app.get("/", tags=["Health"])
-def health_check() -> dict[str, str]:
+async def health_check() -> Response:
     """ヘルスチェックエンドポイント。"""
-    return {"status": "ok", "message": "NFC Card Reader Backend API is running"}
+    return Response(content=HEALTH_CHECK_BODY, media_type="application/json")
 
 
 def main() -> None:
     """メイン関数。Uvicornサーバーを起動する。"""
+    if settings.server_workers > 1:
+        logger.warning(
+            f"Running with {settings.server_workers} workers: "
+            "NFC endpoints are served only by the worker that owns the reader"
+        )
+
     uvicorn.run(
         "main:app",
         host=settings.server_host,
         port=settings.server_port,
         reload=settings.debug_mode,
+        workers=settings.server_workers,
         log_level=settings.log_level.lower(),
+        access_log=settings.access_log,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
     )
 
 
@@ -1,13 +1,20 @@
 """FastAPIエンドポイント定義モジュール。
 
 NFCカード読み取りとユーザー管理のAPIエンドポイントを提供する。
+ブロッキング処理（カード読み取り、CSV操作）はスレッドにオフロードし、
+イベントループを塞がないようにする。
+レスポンスはサーバー側で組み立てた値のみを含むため、
+`model_construct` で検証を省略して生成する。
 """
 
+import asyncio
+import hmac
+
 from fastapi import APIRouter, HTTPException, status
 
 from src.config.settings import get_settings
 from src.logging.logger import get_logger
-from src.nfc.reader import get_nfc_reader
+from src.nfc.reader import NFCReader, get_nfc_reader
 from src.schemas.models import (
     ContinuousModeResponse,
     ScanBufferResponse,
@@ -40,85 +47,106 @@ router = APIRouter()
 # =============================================================================
 
 
-@router.get("/read", response_model=ScanResult, tags=["NFC"])
-def read_card() -> ScanResult:
+def _get_owned_reader() -> NFCReader:
+    """このプロセスが担当しているNFCリーダーを取得する。
+
+    複数ワーカー構成では、リーダーを担当していないワーカーが
+    読み取りや常時読み取りモードの状態を持たないよう503を返す。
+
+    Returns:
+        NFCReader: NFCリーダーインスタンス
+
+    Raises:
+        HTTPException: 他のワーカープロセスがリーダーを担当している場合
+    """
+    reader = get_nfc_reader()
+    if not reader.is_device_owner:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="NFC reader is handled by another worker process",
+        )
+    return reader
+
+
+@router.get("/read", tags=["NFC"])
+async def read_card() -> ScanResult:
     """単発でカードを読み取る。
 
     カードをリーダーにかざすとUID（16進数）を返却する。
     タイムアウト（デフォルト5秒）するとnullを返す。
     """
-    reader = get_nfc_reader()
-    uid_hex = reader.read_single()
+    reader = _get_owned_reader()
+    uid_hex = await asyncio.to_thread(reader.read_single)
 
     if uid_hex:
-        return ScanResult(
+        return ScanResult.model_construct(
             uid_hex=uid_hex,
             success=True,
             message="Card read successfully",
         )
     else:
-        return ScanResult(
+        return ScanResult.model_construct(
             uid_hex=None,
             success=False,
             message="No card detected (timeout)",
         )
 
 
-@router.post("/continuous/start", response_model=ContinuousModeResponse, tags=["NFC"])
-def start_continuous_mode() -> ContinuousModeResponse:
+@router.post("/continuous/start", tags=["NFC"])
+async def start_continuous_mode() -> ContinuousModeResponse:
     """常時読み取りモードを開始する。
 
     バックグラウンドでカードの読み取りを継続し、
     読み取ったUIDをバッファに蓄積する。
     連続して同じカードを読み取った場合は無視される。
     """
-    reader = get_nfc_reader()
+    reader = _get_owned_reader()
     success = reader.start_continuous_mode()
 
     if success:
-        return ContinuousModeResponse(
+        return ContinuousModeResponse.model_construct(
             success=True,
             message="Continuous mode started",
             is_running=True,
         )
     else:
-        return ContinuousModeResponse(
+        return ContinuousModeResponse.model_construct(
             success=False,
             message="Continuous mode is already running",
             is_running=True,
         )
 
 
-@router.post("/continuous/stop", response_model=ContinuousModeResponse, tags=["NFC"])
-def stop_continuous_mode() -> ContinuousModeResponse:
+@router.post("/continuous/stop", tags=["NFC"])
+async def stop_continuous_mode() -> ContinuousModeResponse:
     """常時読み取りモードを停止する。"""
-    reader = get_nfc_reader()
-    success = reader.stop_continuous_mode()
+    reader = _get_owned_reader()
+    success = await asyncio.to_thread(reader.stop_continuous_mode)
 
     if success:
-        return ContinuousModeResponse(
+        return ContinuousModeResponse.model_construct(
             success=True,
             message="Continuous mode stopped",
             is_running=False,
         )
     else:
-        return ContinuousModeResponse(
+        return ContinuousModeResponse.model_construct(
             success=False,
             message="Continuous mode is not running",
             is_running=False,
         )
 
 
-@router.get("/continuous/results", response_model=ScanBufferResponse, tags=["NFC"])
-def get_continuous_results() -> ScanBufferResponse:
+@router.get("/continuous/results", tags=["NFC"])
+async def get_continuous_results() -> ScanBufferResponse:
     """常時読み取りモードで蓄積したUIDリストを取得する。
 
     取得後、バッファはリセットされる。
     """
-    reader = get_nfc_reader()
+    reader = _get_owned_reader()
     uid_list = reader.get_results_and_reset()
 
-    return ScanBufferResponse(
+    return ScanBufferResponse.model_construct(
         uid_hex_list=uid_list,
         count=len(uid_list),
     )
@@ -129,30 +157,30 @@ def get_continuous_results() -> ScanBufferResponse:
 # =============================================================================
 
 
-@router.post("/user/lookup", response_model=UserLookupResponse, tags=["User"])
-def lookup_user_by_uid(request: UserLookupRequest) -> UserLookupResponse:
+@router.post("/user/lookup", tags=["User"])
+async def lookup_user_by_uid(request: UserLookupRequest) -> UserLookupResponse:
     """UIDでユーザーを検索する。
 
     CSVファイルから該当するユーザーを検索して返却する。
     """
-    user = lookup_user_from_csv(request.uid_hex)
+    user = await asyncio.to_thread(lookup_user_from_csv, request.uid_hex)
 
     if user:
-        return UserLookupResponse(
+        return UserLookupResponse.model_construct(
             found=True,
             user=user,
             message="User found",
         )
     else:
-        return UserLookupResponse(
+        return UserLookupResponse.model_construct(
             found=False,
             user=None,
             message="User not found",
         )
 
 
-@router.post("/user/register", response_model=UserRegisterResponse, tags=["User"])
-def register_new_user(request: UserRegisterRequest) -> UserRegisterResponse:
+@router.post("/user/register", tags=["User"])
+async def register_new_user(request: UserRegisterRequest) -> UserRegisterResponse:
     """ユーザーを登録する。
 
     既存のUIDが存在する場合は上書き更新される。
@@ -166,47 +194,50 @@ def register_new_user(request: UserRegisterRequest) -> UserRegisterResponse:
         description=request.description,
     )
 
-    is_update = register_user_to_csv(user)
+    is_update = await asyncio.to_thread(register_user_to_csv, user)
 
     if is_update:
-        return UserRegisterResponse(
+        return UserRegisterResponse.model_construct(
             success=True,
             message="User updated successfully",
             is_update=True,
         )
     else:
-        return UserRegisterResponse(
+        return UserRegisterResponse.model_construct(
             success=True,
             message="User registered successfully",
             is_update=False,
         )
 
 
-@router.delete("/user/delete", response_model=UserDeleteResponse, tags=["User"])
-def delete_existing_user(request: UserDeleteRequest) -> UserDeleteResponse:
+@router.delete("/user/delete", tags=["User"])
+async def delete_existing_user(request: UserDeleteRequest) -> UserDeleteResponse:
     """ユーザーを削除する。
 
     管理者パスワードが必要。
     """
     settings = get_settings()
 
-    # パスワード認証
-    if request.admin_password != settings.admin_password:
+    # パスワード認証（タイミング攻撃を防ぐため定数時間で比較）
+    if not hmac.compare_digest(
+        request.admin_password.encode("utf-8"),
+        settings.admin_password.encode("utf-8"),
+    ):
         logger.warning(f"Invalid admin password attempt for uid: {request.uid_hex}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin password",
         )
 
-    success = delete_user_from_csv(request.uid_hex)
+    success = await asyncio.to_thread(delete_user_from_csv, request.uid_hex)
 
     if success:
-        return UserDeleteResponse(
+        return UserDeleteResponse.model_construct(
             success=True,
             message="User deleted successfully",
         )
     else:
-        return UserDeleteResponse(
+        return UserDeleteResponse.model_construct(
             success=False,
             message="User not found",
         )
@@ -0,0 +1,53 @@
+"""プロセス間排他ロックモジュール。
+
+複数ワーカープロセス構成で、ログファイルやNFCリーダーなど
+1プロセスだけが扱うべき資源の担当を決めるために使用する。
+ロックはファイルを開いている間保持され、プロセス終了時にOSが解放する。
+"""
+
+import sys
+from pathlib import Path
+from typing import BinaryIO
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+def try_lock_file(lock_path: Path) -> BinaryIO | None:
+    """ロックファイルの排他ロックを待たずに取得する。
+
+    Args:
+        lock_path: ロックファイルのパス
+
+    Returns:
+        BinaryIO | None: ロックを保持したファイル、他プロセスが保持している場合はNone
+    """
+    f = open(lock_path, "a+b")
+    try:
+        if sys.platform == "win32":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def unlock_file(f: BinaryIO) -> None:
+    """`try_lock_file` で取得したロックを解放する。
+
+    Args:
+        f: ロックを保持したファイル
+    """
+    try:
+        if sys.platform == "win32":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    finally:
+        f.close()
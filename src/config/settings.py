@@ -32,6 +32,8 @@ class Settings(BaseSettings):
     # ログ設定
     log_dir: Path = Path("logs")
     log_level: str = "INFO"
+    # Uvicornのアクセスログ（リクエストごとに1行出力するため本番では無効を推奨）
+    access_log: bool = False
 
     # セキュリティ
     admin_password: str = "change_me_in_production"
@@ -42,6 +44,8 @@ class Settings(BaseSettings):
     # サーバー設定
     server_host: str = "0.0.0.0"
     server_port: int = 8000
+    # ワーカープロセス数（NFCリーダーは1プロセスだけが扱う）
+    server_workers: int = 1
 
 
 @lru_cache
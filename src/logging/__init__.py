@@ -1,5 +1,5 @@
 """logging パッケージ。"""
 
-from src.logging.logger import get_logger
+from src.logging.logger import get_logger, start_log_listener, stop_log_listener
 
-__all__ = ["get_logger"]
+__all__ = ["get_logger", "start_log_listener", "stop_log_listener"]
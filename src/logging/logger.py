@@ -1,19 +1,38 @@
 """ロギング設定モジュール。
 
 日次ローテーション付きのロガーを提供する。
+各ロガーはログをキューに積むだけとし、コンソール・ファイルへの書き込みは
+QueueListenerの専用スレッドが行う（リクエスト処理やNFC読み取りのスレッドを
+ディスクI/Oで待たせないため）。
+複数ワーカー構成では、プロセスごとに別のログファイルへ出力する
+（同じファイルを複数プロセスでローテーションすると競合するため）。
 """
 
+import atexit
 import logging
+import os
+import queue
 import sys
-from logging.handlers import TimedRotatingFileHandler
+import threading
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
+from typing import BinaryIO
 
+from src.config.process_lock import try_lock_file
 from src.config.settings import get_settings
 
 # ログフォーマット
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# ログファイル名（複数ワーカー構成では2番目以降のプロセスに番号を付ける）
+LOG_FILE_STEM = "app"
+LOG_FILE_SUFFIX = ".log"
+
+# 全ロガー共通のログキュー（上限なし）
+_LOG_QUEUE: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+
 
 def _ensure_log_dir() -> Path:
     """ログディレクトリを作成する。
@@ -27,25 +46,35 @@ def _ensure_log_dir() -> Path:
     return log_dir
 
 
-def get_logger(name: str) -> logging.Logger:
-    """名前付きロガーを取得する。
-
-    Args:
-        name: ロガー名（通常は __name__ を渡す）
+@lru_cache
+def _get_log_level() -> int:
+    """設定からログレベルを求める（プロセス内で1回のみ）。
 
     Returns:
-        logging.Logger: 設定済みのロガー
+        int: ログレベル
     """
     settings = get_settings()
-    logger = logging.getLogger(name)
+    return getattr(logging, settings.log_level.upper(), logging.INFO)
 
-    # 既にハンドラが設定されている場合はスキップ
-    if logger.handlers:
-        return logger
 
-    # ログレベル設定
-    log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
-    logger.setLevel(log_level)
+@lru_cache
+def _get_queue_handler() -> QueueHandler:
+    """全ロガー共通のキューハンドラを生成する（プロセス内で1回のみ）。
+
+    Returns:
+        QueueHandler: ログキューへ積むハンドラ
+    """
+    return QueueHandler(_LOG_QUEUE)
+
+
+@lru_cache
+def _get_output_handlers() -> tuple[logging.Handler, ...]:
+    """実際に出力を行うハンドラを生成する（プロセス内で1回のみ）。
+
+    Returns:
+        tuple[logging.Handler, ...]: コンソールハンドラとファイルハンドラ
+    """
+    log_level = _get_log_level()
 
     # フォーマッター
     formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
@@ -54,11 +83,10 @@ def get_logger(name: str) -> logging.Logger:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
     # ファイルハンドラ（日次ローテーション）
     log_dir = _ensure_log_dir()
-    log_file = log_dir / "app.log"
+    log_file = log_dir / _LogFileSlot.file_name(log_dir)
     file_handler = TimedRotatingFileHandler(
         filename=log_file,
         when="midnight",
@@ -69,6 +97,128 @@ def get_logger(name: str) -> logging.Logger:
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
     file_handler.suffix = "%Y-%m-%d"
-    logger.addHandler(file_handler)
+
+    return console_handler, file_handler
+
+
+class _LogFileSlot:
+    """プロセスごとのログファイル名の管理クラス（シングルトン）。
+
+    複数ワーカー構成では、ワーカーとそれらを起動する親プロセスがそれぞれ
+    番号付きのロックファイルを取得し、取得できた番号のログファイルへ出力する。
+    番号はワーカー数＋1の範囲に収まるため、再起動してもファイル名は増えず、
+    日次ローテーションの世代管理もファイルごとに働く。
+    """
+
+    _name: str | None = None
+    _lock_file: BinaryIO | None = None
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def file_name(cls, log_dir: Path) -> str:
+        """このプロセスのログファイル名を取得する。
+
+        Args:
+            log_dir: ログディレクトリのパス
+
+        Returns:
+            str: ログファイル名
+        """
+        with cls._lock:
+            if cls._name is None:
+                cls._name = cls._acquire(log_dir)
+            return cls._name
+
+    @classmethod
+    def _acquire(cls, log_dir: Path) -> str:
+        """空いている番号のロックを取得してログファイル名を決める。
+
+        Args:
+            log_dir: ログディレクトリのパス
+
+        Returns:
+            str: ログファイル名
+        """
+        settings = get_settings()
+        if settings.server_workers <= 1:
+            return LOG_FILE_STEM + LOG_FILE_SUFFIX
+
+        # 親プロセスもログを出力するため、ワーカー数＋1個の番号を用意する
+        for slot in range(settings.server_workers + 1):
+            lock_file = try_lock_file(log_dir / f".{LOG_FILE_STEM}-{slot}.lock")
+            if lock_file is None:
+                continue
+            cls._lock_file = lock_file
+            if slot == 0:
+                return LOG_FILE_STEM + LOG_FILE_SUFFIX
+            return f"{LOG_FILE_STEM}-{slot}{LOG_FILE_SUFFIX}"
+
+        # 番号がすべて使用中の場合はプロセスIDで区別する
+        return f"{LOG_FILE_STEM}-pid{os.getpid()}{LOG_FILE_SUFFIX}"
+
+
+class _LogListener:
+    """ログキューを処理するQueueListenerの管理クラス（シングルトン）。"""
+
+    _listener: QueueListener | None = None
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def start(cls) -> None:
+        """リスナーを開始する（開始済みの場合は何もしない）。"""
+        with cls._lock:
+            if cls._listener is not None:
+                return
+            cls._listener = QueueListener(
+                _LOG_QUEUE, *_get_output_handlers(), respect_handler_level=True
+            )
+            cls._listener.start()
+
+    @classmethod
+    def stop(cls) -> None:
+        """キューに残ったログを書き出してリスナーを停止する。"""
+        with cls._lock:
+            if cls._listener is None:
+                return
+            cls._listener.stop()
+            cls._listener = None
+
+
+def start_log_listener() -> None:
+    """ログ出力スレッドを開始する。"""
+    _LogListener.start()
+
+
+def stop_log_listener() -> None:
+    """ログ出力スレッドを停止する。
+
+    停止中に記録されたログはキューに保持され、次回開始時に出力される。
+    """
+    _LogListener.stop()
+
+
+atexit.register(stop_log_listener)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """名前付きロガーを取得する。
+
+    Args:
+        name: ロガー名（通常は __name__ を渡す）
+
+    Returns:
+        logging.Logger: 設定済みのロガー
+    """
+    logger = logging.getLogger(name)
+
+    # 既にハンドラが設定されている場合はスキップ
+    if logger.handlers:
+        return logger
+
+    logger.setLevel(_get_log_level())
+
+    # キューハンドラ（実際の出力はQueueListenerが行う）
+    logger.addHandler(_get_queue_handler())
+    start_log_listener()
 
     return logger
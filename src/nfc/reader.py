@@ -3,21 +3,31 @@
 SONY RC-S300 NFCカードリーダーの操作を行う。
 シングルトンパターンで実装し、常時読み取りモードをサポートする。
 PC/SC API（pyscard）を使用し、ドライバ変更不要で動作する。
+複数ワーカー構成では、ロックファイルを取得した1プロセスだけがリーダーを扱う。
 """
 
-import random
+import secrets
 import threading
 import time
 from collections import deque
+from typing import TYPE_CHECKING, BinaryIO
 
+from src.config.process_lock import try_lock_file, unlock_file
 from src.config.settings import get_settings
 from src.logging.logger import get_logger
 
+if TYPE_CHECKING:
+    from smartcard.CardRequest import CardRequest
+
 logger = get_logger(__name__)
 
 # 定数
 DEFAULT_SCAN_TIMEOUT = 5.0
 CONTINUOUS_SCAN_INTERVAL = 0.5
+CARD_POLL_INTERVAL = 0.1
+DUMMY_UID_BYTES = 7
+# リーダーを扱うプロセスを決めるロックファイル（ユーザーCSVと同じディレクトリに置く）
+NFC_OWNER_LOCK_NAME = "nfc_reader.lock"
 
 # PC/SC APDUコマンド
 GET_UID_COMMAND = [0xFF, 0xCA, 0x00, 0x00, 0x00]
@@ -54,18 +64,27 @@ class NFCReader:
             maxlen=self._settings.max_scan_buffer_size
         )
         self._last_uid: str | None = None
+        self._buffer_lock: threading.Lock = threading.Lock()
         self._continuous_mode: bool = False
         self._scan_thread: threading.Thread | None = None
         self._stop_event: threading.Event = threading.Event()
+        self._card_request: "CardRequest | None" = None
+        self._pcsc_lock: threading.Lock = threading.Lock()
+        self._owner_lock: BinaryIO | None = None
         self._initialized = True
 
         logger.info("NFCReader initialized")
 
-    def read_single(self, timeout: float = DEFAULT_SCAN_TIMEOUT) -> str | None:
+    def read_single(
+        self,
+        timeout: float = DEFAULT_SCAN_TIMEOUT,
+        cancel_event: threading.Event | None = None,
+    ) -> str | None:
         """単発でカードを読み取る。
 
         Args:
             timeout: 読み取りタイムアウト秒数
+            cancel_event: セットされた時点で読み取りを打ち切るイベント
 
         Returns:
             str | None: カードのUID（16進数文字列）、タイムアウト時はNone
@@ -73,62 +92,135 @@ class NFCReader:
         if self._settings.debug_mode:
             return self._generate_dummy_uid()
 
-        return self._read_card_pcsc(timeout)
+        return self._read_card_pcsc(timeout, cancel_event)
 
-    def _read_card_pcsc(self, timeout: float) -> str | None:
+    def _read_card_pcsc(
+        self, timeout: float, cancel_event: threading.Event | None = None
+    ) -> str | None:
         """PC/SC APIを使用してカードを読み取る。
 
+        タイムアウトまで短い間隔でポーリングし、ポーリングの合間に
+        `cancel_event` を確認する。これにより停止要求に素早く応答し、
+        他スレッドの読み取りもポーリングの合間に割り込める。
+
         Args:
             timeout: 読み取りタイムアウト秒数
+            cancel_event: セットされた時点で読み取りを打ち切るイベント
 
         Returns:
             str | None: カードのUID（16進数文字列）、タイムアウト時はNone
         """
         try:
-            from smartcard.CardRequest import CardRequest
-            from smartcard.CardType import AnyCardType
             from smartcard.Exceptions import CardRequestTimeoutException
             from smartcard.util import toHexString
+        except ImportError:
+            logger.error("pyscard is not installed")
+            return None
 
-            cardtype = AnyCardType()
-            cardrequest = CardRequest(timeout=timeout, cardType=cardtype)
+        deadline = time.monotonic() + timeout
 
-            try:
-                cardservice = cardrequest.waitforcard()
-                cardservice.connection.connect()
+        try:
+            while time.monotonic() < deadline:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.debug("Card read cancelled")
+                    return None
 
-                # Get UID command (APDU)
-                data, sw1, sw2 = cardservice.connection.transmit(GET_UID_COMMAND)
+                with self._pcsc_lock:
+                    cardrequest = self._get_card_request()
 
-                uid_hex: str | None = None
-                if sw1 == 0x90 and sw2 == 0x00:
-                    uid_hex = toHexString(data).replace(" ", "").lower()
-                    logger.info(f"Card read: {uid_hex}")
-                else:
-                    logger.warning(f"Failed to get UID: SW1={hex(sw1)}, SW2={hex(sw2)}")
+                    try:
+                        cardservice = cardrequest.waitforcard()
+                    except CardRequestTimeoutException:
+                        continue
 
-                cardservice.connection.disconnect()
-                return uid_hex
+                    cardservice.connection.connect()
 
-            except CardRequestTimeoutException:
-                logger.debug("Card read timeout - no card detected")
-                return None
+                    # Get UID command (APDU)
+                    data, sw1, sw2 = cardservice.connection.transmit(GET_UID_COMMAND)
+
+                    uid_hex: str | None = None
+                    if sw1 == 0x90 and sw2 == 0x00:
+                        uid_hex = toHexString(data).replace(" ", "").lower()
+                        logger.info("Card read: %s", uid_hex)
+                    else:
+                        logger.warning("Failed to get UID: SW1=%#x, SW2=%#x", sw1, sw2)
+
+                    cardservice.connection.disconnect()
+                    return uid_hex
 
-        except ImportError:
-            logger.error("pyscard is not installed")
-            return None
         except OSError as e:
             logger.error(f"NFC device connection failed: {e}")
             return None
 
+        logger.debug("Card read timeout - no card detected")
+        return None
+
+    def _get_card_request(self) -> "CardRequest":
+        """ポーリング用のCardRequestを取得する。
+
+        CardRequestは生成時にPC/SCコンテキストを確立するため、
+        読み取りのたびに生成せず使い回す。
+        呼び出し側で `_pcsc_lock` を保持すること。
+
+        Returns:
+            CardRequest: カード待ち受け用のリクエスト
+        """
+        if self._card_request is None:
+            from smartcard.CardRequest import CardRequest
+            from smartcard.CardType import AnyCardType
+
+            self._card_request = CardRequest(
+                timeout=CARD_POLL_INTERVAL, cardType=AnyCardType()
+            )
+        return self._card_request
+
+    def acquire_device(self) -> bool:
+        """このプロセスをNFCリーダーの担当として登録する。
+
+        複数ワーカー構成で各プロセスが同じリーダーを奪い合わないよう、
+        ロックファイルを取得できたプロセスだけを担当とする。
+
+        Returns:
+            bool: 担当になった（既に担当である）場合True、
+                他プロセスが担当している場合False
+        """
+        if self._owner_lock is not None:
+            return True
+
+        lock_dir = self._settings.user_data_csv_path.parent
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        self._owner_lock = try_lock_file(lock_dir / NFC_OWNER_LOCK_NAME)
+        return self._owner_lock is not None
+
+    @property
+    def is_device_owner(self) -> bool:
+        """このプロセスがNFCリーダーの担当かどうかを返す。
+
+        Returns:
+            bool: 担当ならTrue
+        """
+        return self._owner_lock is not None
+
+    def close(self) -> None:
+        """保持しているPC/SCリソースと担当のロックを解放する。"""
+        with self._pcsc_lock:
+            # PC/SCコンテキストはCardRequestの破棄時に解放される
+            self._card_request = None
+
+        if self._owner_lock is not None:
+            unlock_file(self._owner_lock)
+            self._owner_lock = None
+
+        logger.info("NFCReader closed")
+
     def _generate_dummy_uid(self) -> str:
         """デバッグ用のダミーUIDを生成する。
 
         Returns:
             str: ランダムな16進数UID
         """
-        uid = "".join(random.choices("0123456789abcdef", k=14))
-        logger.info(f"[DEBUG] Dummy card read: {uid}")
+        uid = secrets.token_hex(DUMMY_UID_BYTES)
+        logger.info("[DEBUG] Dummy card read: %s", uid)
         return uid
 
     def start_continuous_mode(self) -> bool:
@@ -178,16 +270,25 @@ class NFCReader:
         logger.info("Continuous scan loop started")
 
         while not self._stop_event.is_set():
-            uid = self.read_single(timeout=CONTINUOUS_SCAN_INTERVAL)
-
-            if uid and uid != self._last_uid:
-                self._scan_buffer.append(uid)
-                self._last_uid = uid
-                logger.info(f"Continuous mode - new card: {uid}")
-            elif uid and uid == self._last_uid:
-                logger.debug(f"Continuous mode - duplicate ignored: {uid}")
+            uid = self.read_single(
+                timeout=CONTINUOUS_SCAN_INTERVAL, cancel_event=self._stop_event
+            )
+
+            if uid:
+                with self._buffer_lock:
+                    is_new = uid != self._last_uid
+                    if is_new:
+                        self._scan_buffer.append(uid)
+                        self._last_uid = uid
+
+                if is_new:
+                    logger.info("Continuous mode - new card: %s", uid)
+                else:
+                    logger.debug("Continuous mode - duplicate ignored: %s", uid)
 
-            time.sleep(CONTINUOUS_SCAN_INTERVAL)
+            # 停止要求があれば待機を打ち切って即座に終了する
+            if self._stop_event.wait(CONTINUOUS_SCAN_INTERVAL):
+                break
 
         logger.info("Continuous scan loop stopped")
 
@@ -197,11 +298,15 @@ class NFCReader:
         Returns:
             list[str]: 読み取ったUID（16進数文字列）のリスト
         """
-        results = list(self._scan_buffer)
-        self._scan_buffer.clear()
-        self._last_uid = None
+        # 読み取りスレッドとの競合を避けるため、ロック内でバッファごと差し替える
+        with self._buffer_lock:
+            drained = self._scan_buffer
+            self._scan_buffer = deque(maxlen=self._settings.max_scan_buffer_size)
+            self._last_uid = None
 
-        logger.info(f"Results retrieved and reset: {len(results)} cards")
+        results = list(drained)
+
+        logger.info("Results retrieved and reset: %d cards", len(results))
         return results
 
     def is_continuous_mode_running(self) -> bool:
@@ -225,7 +330,12 @@ class NFCReader:
 def get_nfc_reader() -> NFCReader:
     """NFCReaderのシングルトンインスタンスを取得する。
 
+    生成済みの場合は `__new__`/`__init__` を経由せずにそのまま返す。
+
     Returns:
         NFCReader: NFCリーダーインスタンス
     """
+    instance = NFCReader._instance
+    if instance is not None:
+        return instance
     return NFCReader()
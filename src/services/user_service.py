@@ -1,41 +1,471 @@
 """ユーザーサービスモジュール。
 
 CSVファイルを使用したユーザーデータのCRUD操作を提供する。
+CSVの内容はUIDをキーとしたインメモリ索引に読み込み、
+ファイルが変更されるまで再利用する。
 """
 
+import codecs
 import csv
+import os
+import sys
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from functools import cache
+from operator import itemgetter
 from pathlib import Path
 
 from src.config.settings import get_settings
 from src.logging.logger import get_logger
 from src.schemas.models import UserData
 
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
 logger = get_logger(__name__)
 
 # CSVヘッダー
 CSV_HEADERS = ["uid_hex", "id", "name", "email", "role", "description"]
 
+# 読み込み時のエンコーディング（Excelの「CSV UTF-8」が付けるBOMを除去する）
+CSV_READ_ENCODING = "utf-8-sig"
+
+# 書き換え時の一時ファイルの接尾辞
+CSV_TEMP_SUFFIX = ".tmp"
+
+# 書き込み時に排他ロックを取得するロックファイルの接尾辞
+CSV_LOCK_SUFFIX = ".lock"
+
+# 全件読み込み・全件書き換え時のバッファサイズ（1 MiB）
+CSV_IO_BUFFER_SIZE = 1 << 20
+
+
+class _UserIndex:
+    """CSVファイルから構築したユーザーのインメモリ索引。
+
+    UID（小文字）をキーにユーザーデータを保持する。
+    CSVファイルのパス・inode番号・更新時刻（ナノ秒）・サイズのいずれかが
+    変わった場合は再読み込みする。同一時刻内の追記はサイズの変化で、
+    同一時刻内の同サイズの書き換えは `os.replace` によるinodeの変化で検出できる。
+    書き込み操作はファイルロック、`lock` の順に取得し、保持したまま
+    索引とファイルを更新する。読み込みはファイルが変更されていなければ
+    `lock` を取得せずに索引を返すため、書き込み中も待たされない。
+    """
+
+    def __init__(self) -> None:
+        """初期化。"""
+        self._users: dict[str, UserData] = {}
+        self._source: tuple[Path, int, int, int] | None = None
+        self._header: list[str] | None = None
+        self.lock = threading.RLock()
+
+    def users(self, csv_path: Path) -> dict[str, UserData]:
+        """最新の索引を取得する。
+
+        Args:
+            csv_path: CSVファイルのパス
+
+        Returns:
+            dict[str, UserData]: 小文字UIDをキーとしたユーザーデータ
+        """
+        # 変更がなければロックなしで返す（`_source` は索引の更新後に設定される）
+        if self._source == self._current_signature(csv_path):
+            return self._users
+
+        with self.lock:
+            source = self._current_signature(csv_path)
+            if self._source != source:
+                self._users, self._header = _load_users(csv_path)
+                self._source = source
+            return self._users
+
+    @staticmethod
+    def _current_signature(csv_path: Path) -> tuple[Path, int, int, int]:
+        """CSVファイルのシグネチャを取得する（削除されていれば再作成する）。
+
+        Args:
+            csv_path: CSVファイルのパス
+
+        Returns:
+            tuple[Path, int, int, int]: CSVファイルのシグネチャ
+        """
+        try:
+            return _file_signature(csv_path)
+        except FileNotFoundError:
+            # 確認済みのCSVファイルが削除された場合はテンプレートを再作成する
+            # （書き込み中は呼び出し側がファイルロックを保持しているため、
+            # ロックを取得しない方のみを使う）
+            _create_csv_template(csv_path)
+            return _file_signature(csv_path)
+
+    @property
+    def header(self) -> list[str] | None:
+        """最後に読み込んだCSVファイルのヘッダーを返す。
+
+        追記する行はこの列順に合わせる。
+
+        Returns:
+            list[str] | None: ヘッダー、ヘッダー行がない場合はNone
+        """
+        return self._header
+
+    def mark_synced(self, csv_path: Path) -> None:
+        """索引の内容をCSVファイルに書き込んだことを記録する。
+
+        Args:
+            csv_path: CSVファイルのパス
+        """
+        with self.lock:
+            self._source = _file_signature(csv_path)
+
+    def invalidate(self) -> None:
+        """索引を破棄し、次回アクセス時に再読み込みさせる。"""
+        with self.lock:
+            self._source = None
+
+
+_user_index = _UserIndex()
+
+
+def _file_signature(csv_path: Path) -> tuple[Path, int, int, int]:
+    """CSVファイルの変更検出用シグネチャを取得する。
+
+    Args:
+        csv_path: CSVファイルのパス
+
+    Returns:
+        tuple[Path, int, int, int]: (パス, inode番号, 更新時刻（ナノ秒）, サイズ)
+    """
+    stat = csv_path.stat()
+    return csv_path, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def _file_lock(csv_path: Path) -> Generator[None, None, None]:
+    """CSVファイルの書き込み用の排他ロックを取得する。
+
+    ワーカープロセス間でも書き込みを直列化するため、CSVファイルと同じ
+    ディレクトリのロックファイルにOSのアドバイザリロックを掛ける。
+    読み込みはロックしない（書き換えは `os.replace` で原子的に行うため）。
+
+    Args:
+        csv_path: CSVファイルのパス
+
+    Yields:
+        None: ロックを保持している間
+    """
+    lock_path = csv_path.with_name(csv_path.name + CSV_LOCK_SUFFIX)
+    with open(lock_path, "a+b") as f:
+        if sys.platform == "win32":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
 
 def _ensure_csv_file() -> Path:
     """CSVファイルが存在することを確認し、なければテンプレートを作成する。
 
+    確認はパスごとに初回のみ行い、以降は確認済みのパスをそのまま返す。
+
     Returns:
         Path: CSVファイルのパス
     """
-    settings = get_settings()
-    csv_path = settings.user_data_csv_path
+    return _prepare_csv_file(get_settings().user_data_csv_path)
+
+
+@cache
+def _prepare_csv_file(csv_path: Path) -> Path:
+    """ディレクトリとCSVテンプレートを作成する（パスごとに1回のみ）。
+
+    起動後にCSVファイルが削除された場合は、索引の更新確認時に再作成する。
+
+    Args:
+        csv_path: CSVファイルのパス
+
+    Returns:
+        Path: CSVファイルのパス
+    """
+    _create_csv_file(csv_path)
+    return csv_path
+
+
+def _create_csv_file(csv_path: Path) -> None:
+    """CSVファイルを用意し、既存の空ファイルにはロックを取得してヘッダーを書く。
+
+    ファイルがなければ `_create_csv_template` でテンプレートを作成する。
+    既存の空ファイルには `_file_lock` を取得してヘッダーを書き込むため、
+    ファイルロックの保持中には呼び出さないこと。
+
+    Args:
+        csv_path: CSVファイルのパス
+    """
+    if _create_csv_template(csv_path):
+        return
+
+    # 既存の空ファイルにはヘッダーを書き込む
+    # （ヘッダー行が常に存在する前提で列位置を求めるため）
+    with _file_lock(csv_path):
+        if csv_path.stat().st_size == 0:
+            with open(csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADERS)
+            logger.info(f"Wrote CSV header to empty file: {csv_path}")
+
+
+def _create_csv_template(csv_path: Path) -> bool:
+    """CSVファイルが存在しない場合のみ、排他的に新規作成する。
+
+    ディレクトリも作成する。ファイルロックを取得しないため、
+    ロック保持中にも呼び出せる。
 
+    Args:
+        csv_path: CSVファイルのパス
+
+    Returns:
+        bool: 新規作成した場合True、既に存在した場合False
+    """
     # ディレクトリ作成
     csv_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # ファイルが存在しない場合はテンプレート作成
-    if not csv_path.exists():
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+    # ファイルが存在しない場合のみ作成する（O_EXCLのため複数ワーカーの
+    # 同時起動でも作成は1回になる）
+    try:
+        with open(csv_path, "x", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(CSV_HEADERS)
-        logger.info(f"Created CSV template: {csv_path}")
+    except FileExistsError:
+        return False
+
+    logger.info(f"Created CSV template: {csv_path}")
+    return True
 
-    return csv_path
+
+def _reset_path_cache() -> None:
+    """確認済みCSVパスのキャッシュを破棄する（主にテスト用）。"""
+    _prepare_csv_file.cache_clear()
+
+
+def _uid_position(csv_path: Path, header: list[str]) -> int:
+    """ヘッダーからUID列の位置を求める。
+
+    Args:
+        csv_path: CSVファイルのパス
+        header: CSVファイルのヘッダー
+
+    Returns:
+        int: UID列の位置
+
+    Raises:
+        ValueError: ヘッダーにUID列がない場合
+    """
+    try:
+        return header.index("uid_hex")
+    except ValueError:
+        raise ValueError(f"CSV header has no uid_hex column: {csv_path}") from None
+
+
+def _load_users(csv_path: Path) -> tuple[dict[str, UserData], list[str] | None]:
+    """CSVファイルを読み込み、UIDをキーとした索引を構築する。
+
+    同じUIDが複数行ある場合は先頭の行を採用する。
+    行ごとの辞書生成を避けるため、ヘッダーから列位置を一度だけ求めて
+    各行を位置で取り出す。欠けている列は空文字として扱う。
+    CSVの値は常に文字列のため、モデルはバリデーションを省略して生成する。
+
+    Args:
+        csv_path: CSVファイルのパス
+
+    Returns:
+        tuple[dict[str, UserData], list[str] | None]: 小文字UIDをキーとした
+            ユーザーデータと、ヘッダー（ヘッダー行がない場合はNone）
+
+    Raises:
+        ValueError: ヘッダーにUID列がない場合
+    """
+    users: dict[str, UserData] = {}
+    with open(
+        csv_path,
+        "r",
+        buffering=CSV_IO_BUFFER_SIZE,
+        newline="",
+        encoding=CSV_READ_ENCODING,
+    ) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            logger.debug("Loaded user index: 0 users")
+            return users, None
+
+        # UID列がないと全行が同じキーに潰れるため読み込まない
+        _uid_position(csv_path, header)
+
+        # ヘッダーにない列は行末に補った空文字を参照させる
+        width = len(header)
+        positions = [
+            header.index(column) if column in header else width
+            for column in CSV_HEADERS
+        ]
+        row_width = width + 1 if width in positions else width
+        get_fields = itemgetter(*positions)
+
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != row_width:
+                row = row[:width] + [""] * (row_width - min(len(row), width))
+
+            uid_hex, user_id, name, email, role, description = get_fields(row)
+            user = UserData.model_construct(
+                uid_hex=uid_hex,
+                id=user_id,
+                name=name,
+                email=email,
+                role=role,
+                description=description,
+            )
+            users.setdefault(uid_hex.lower(), user)
+
+    logger.debug(f"Loaded user index: {len(users)} users")
+    return users, header
+
+
+def _user_row(user: UserData) -> tuple[str, str, str, str, str, str]:
+    """ユーザーデータを `CSV_HEADERS` の列順のタプルに変換する。
+
+    Args:
+        user: ユーザーデータ
+
+    Returns:
+        tuple[str, str, str, str, str, str]: CSVの1行分の値
+    """
+    return user.uid_hex, user.id, user.name, user.email, user.role, user.description
+
+
+def _header_row(
+    header: list[str], user: UserData, base: list[str] | None = None
+) -> list[str]:
+    """ユーザーデータをCSVファイルのヘッダーの列順の行に変換する。
+
+    Args:
+        header: CSVファイルのヘッダー
+        user: ユーザーデータ
+        base: 置き換え前の行（`CSV_HEADERS` にない列の値を引き継ぐ）
+
+    Returns:
+        list[str]: CSVの1行分の値
+    """
+    if header == CSV_HEADERS:
+        return list(_user_row(user))
+
+    values = dict(zip(CSV_HEADERS, _user_row(user)))
+    base = base or []
+    return [
+        values[column] if column in values else (base[i] if i < len(base) else "")
+        for i, column in enumerate(header)
+    ]
+
+
+def _rewrite_users(csv_path: Path, key: str, user: UserData | None) -> None:
+    """CSVファイルを書き換え、指定したUIDの行を置き換えまたは削除する。
+
+    対象外の行は手動で追加された重複行も含め、読み込んだまま書き戻す。
+    `user` を指定した場合は対象の行をそのユーザーで置き換え（対象の行が
+    なければ末尾に追加し）、Noneの場合は対象の行を削除する。
+    同じディレクトリの一時ファイルに書き出し、ディスクへ同期してから
+    置き換えるため、書き込み途中の失敗や電源断でも元のファイルは壊れない。
+
+    Args:
+        csv_path: CSVファイルのパス
+        key: 対象の小文字UID
+        user: 置き換えるユーザーデータ、削除する場合はNone
+
+    Raises:
+        ValueError: ヘッダーにUID列がない場合
+    """
+    with open(csv_path, "rb") as f:
+        has_bom = f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8
+
+    temp_path = csv_path.with_name(csv_path.name + CSV_TEMP_SUFFIX)
+    try:
+        with (
+            open(
+                csv_path,
+                "r",
+                buffering=CSV_IO_BUFFER_SIZE,
+                newline="",
+                encoding=CSV_READ_ENCODING,
+            ) as src,
+            open(
+                temp_path,
+                "w",
+                buffering=CSV_IO_BUFFER_SIZE,
+                newline="",
+                # Excelで開けるよう、元のファイルにBOMがあれば引き継ぐ
+                encoding="utf-8-sig" if has_bom else "utf-8",
+            ) as dst,
+        ):
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            header = next(reader, None) or CSV_HEADERS
+            uid_position = _uid_position(csv_path, header)
+            writer.writerow(header)
+
+            matched = False
+            for row in reader:
+                is_target = uid_position < len(row) and row[uid_position].lower() == key
+                if not is_target:
+                    writer.writerow(row)
+                    continue
+                matched = True
+                if user is not None:
+                    writer.writerow(_header_row(header, user, row))
+
+            if user is not None and not matched:
+                writer.writerow(_header_row(header, user))
+
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(temp_path, csv_path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _append_user(csv_path: Path, user: UserData, header: list[str]) -> None:
+    """ユーザーデータをCSVファイルの末尾に1行追記する。
+
+    行はファイルのヘッダーの列順に合わせる。
+    手動編集などでファイル末尾が改行で終わっていない場合は改行を補う。
+
+    Args:
+        csv_path: CSVファイルのパス
+        user: 追記するユーザーデータ
+        header: CSVファイルのヘッダー
+    """
+    with open(csv_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        needs_newline = False
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
+
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        if needs_newline:
+            f.write(csv.excel.lineterminator)
+        writer = csv.writer(f)
+        writer.writerow(_header_row(header, user))
 
 
 def lookup_user(uid_hex: str) -> UserData | None:
@@ -48,28 +478,20 @@ def lookup_user(uid_hex: str) -> UserData | None:
         UserData | None: 見つかったユーザーデータ、見つからない場合はNone
     """
     csv_path = _ensure_csv_file()
+    user = _user_index.users(csv_path).get(uid_hex.lower())
 
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get("uid_hex", "").lower() == uid_hex.lower():
-                logger.info(f"User found: {uid_hex}")
-                return UserData(
-                    uid_hex=row.get("uid_hex", ""),
-                    id=row.get("id", ""),
-                    name=row.get("name", ""),
-                    email=row.get("email", ""),
-                    role=row.get("role", ""),
-                    description=row.get("description", ""),
-                )
-
-    logger.info(f"User not found: {uid_hex}")
-    return None
+    if user:
+        logger.info(f"User found: {uid_hex}")
+    else:
+        logger.info(f"User not found: {uid_hex}")
+    return user
 
 
 def register_user(user: UserData) -> bool:
     """ユーザーを登録する（既存の場合は上書き）。
 
+    UIDは小文字に正規化して保存する。
+
     Args:
         user: 登録するユーザーデータ
 
@@ -77,33 +499,36 @@ def register_user(user: UserData) -> bool:
         bool: 既存ユーザーの上書きの場合True、新規登録の場合False
     """
     csv_path = _ensure_csv_file()
-
-    # 既存データを読み込み
-    rows: list[dict[str, str]] = []
-    is_update = False
-
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get("uid_hex", "").lower() == user.uid_hex.lower():
-                # 既存ユーザーを上書き
-                rows.append(user.model_dump())
-                is_update = True
-                logger.info(f"User updated: {user.uid_hex}")
+    key = user.uid_hex.lower()
+    if user.uid_hex != key:
+        user = user.model_copy(update={"uid_hex": key})
+
+    # 他ワーカーの書き込み待ちの間に読み込みを止めないよう、
+    # ファイルロックを先に取得してから索引のロックを取得する
+    with _file_lock(csv_path), _user_index.lock:
+        # 他プロセスの書き込みを取り込むため、ロック取得後に索引を確認する
+        users = _user_index.users(csv_path)
+        is_update = key in users
+
+        # 新規登録は追記のみ、上書き更新時のみファイル全体を書き換える
+        # （ヘッダー行がない場合はヘッダーを書くため全体を書き換える）
+        # 索引はファイルへの書き込みが成功してから更新する
+        header = _user_index.header
+        try:
+            if is_update or header is None:
+                _rewrite_users(csv_path, key, user)
             else:
-                rows.append(dict(row))
-
-    # 新規ユーザーの場合は追加
-    if not is_update:
-        rows.append(user.model_dump())
+                _append_user(csv_path, user, header)
+        except Exception:
+            _user_index.invalidate()
+            raise
+        users[key] = user
+        _user_index.mark_synced(csv_path)
+
+    if is_update:
+        logger.info(f"User updated: {user.uid_hex}")
+    else:
         logger.info(f"User registered: {user.uid_hex}")
-
-    # ファイルに書き込み
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        writer.writeheader()
-        writer.writerows(rows)
-
     return is_update
 
 
@@ -117,30 +542,24 @@ def delete_user(uid_hex: str) -> bool:
         bool: 削除成功時True、ユーザーが見つからない場合False
     """
     csv_path = _ensure_csv_file()
-
-    # 既存データを読み込み
-    rows: list[dict[str, str]] = []
-    found = False
-
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get("uid_hex", "").lower() == uid_hex.lower():
-                found = True
-                logger.info(f"User deleted: {uid_hex}")
-            else:
-                rows.append(dict(row))
-
-    if not found:
-        logger.warning(f"User not found for deletion: {uid_hex}")
-        return False
-
-    # ファイルに書き込み
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        writer.writeheader()
-        writer.writerows(rows)
-
+    key = uid_hex.lower()
+
+    with _file_lock(csv_path), _user_index.lock:
+        users = _user_index.users(csv_path)
+        if key not in users:
+            logger.warning(f"User not found for deletion: {uid_hex}")
+            return False
+
+        # 索引はファイルへの書き込みが成功してから更新する
+        try:
+            _rewrite_users(csv_path, key, None)
+        except Exception:
+            _user_index.invalidate()
+            raise
+        del users[key]
+        _user_index.mark_synced(csv_path)
+
+    logger.info(f"User deleted: {uid_hex}")
     return True
 
 
@@ -151,21 +570,7 @@ def get_all_users() -> list[UserData]:
         list[UserData]: 全ユーザーのリスト
     """
     csv_path = _ensure_csv_file()
-
-    users: list[UserData] = []
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            users.append(
-                UserData(
-                    uid_hex=row.get("uid_hex", ""),
-                    id=row.get("id", ""),
-                    name=row.get("name", ""),
-                    email=row.get("email", ""),
-                    role=row.get("role", ""),
-                    description=row.get("description", ""),
-                )
-            )
+    users = list(_user_index.users(csv_path).values())
 
     logger.debug(f"Retrieved {len(users)} users")
     return users
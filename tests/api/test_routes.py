@@ -12,6 +12,7 @@ class TestHealthCheck:
         """ヘルスチェックが正常に動作する。"""
         response = test_client.get("/")
         assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
         data = response.json()
         assert data["status"] == "ok"
         assert "NFC Card Reader Backend API" in data["message"]
@@ -31,6 +32,15 @@ class TestReadEndpoint:
             assert data["success"] is True
             assert data["uid_hex"] == "0123456789ab"
 
+    def test_read_card_not_device_owner(self, test_client: TestClient) -> None:
+        """他のワーカーがリーダーを担当している場合は503が返される。"""
+        with patch("src.api.routes.get_nfc_reader") as mock_reader:
+            mock_reader.return_value.is_device_owner = False
+
+            response = test_client.get("/read")
+            assert response.status_code == 503
+            mock_reader.return_value.read_single.assert_not_called()
+
     def test_read_card_timeout(self, test_client: TestClient) -> None:
         """カード読み取りタイムアウト時はnullが返される。"""
         with patch("src.api.routes.get_nfc_reader") as mock_reader:
@@ -95,6 +105,29 @@ class TestContinuousMode:
             assert data["count"] == 3
             assert data["uid_hex_list"] == ["uid1", "uid2", "uid3"]
 
+    def test_continuous_mode_not_device_owner(self, test_client: TestClient) -> None:
+        """他のワーカーがリーダーを担当している場合は503が返される。"""
+        with patch("src.api.routes.get_nfc_reader") as mock_reader:
+            mock_reader.return_value.is_device_owner = False
+
+            assert test_client.post("/continuous/start").status_code == 503
+            assert test_client.post("/continuous/stop").status_code == 503
+            assert test_client.get("/continuous/results").status_code == 503
+            mock_reader.return_value.start_continuous_mode.assert_not_called()
+
+    def test_get_results_compressed(self, test_client: TestClient) -> None:
+        """大きな結果リストはgzip圧縮して返される。"""
+        uid_list = [f"{i:014x}" for i in range(100)]
+        with patch("src.api.routes.get_nfc_reader") as mock_reader:
+            mock_reader.return_value.get_results_and_reset.return_value = uid_list
+
+            response = test_client.get(
+                "/continuous/results", headers={"Accept-Encoding": "gzip"}
+            )
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.json()["uid_hex_list"] == uid_list
+
 
 class TestUserEndpoints:
     """ユーザー管理エンドポイントのテスト。"""
@@ -204,6 +237,29 @@ class TestUserEndpoints:
             )
             assert response.status_code == 401
 
+    def test_delete_user_non_ascii_password(self, test_client: TestClient) -> None:
+        """ASCII以外の文字を含むパスワードも比較できる。"""
+        with (
+            patch("src.api.routes.delete_user_from_csv") as mock_delete,
+            patch("src.api.routes.get_settings") as mock_settings,
+        ):
+            mock_delete.return_value = True
+            mock_settings.return_value.admin_password = "管理者パスワード"
+
+            response = test_client.request(
+                "DELETE",
+                "/user/delete",
+                json={"uid_hex": "0123456789ab", "admin_password": "管理者パスワード"},
+            )
+            assert response.status_code == 200
+
+            response = test_client.request(
+                "DELETE",
+                "/user/delete",
+                json={"uid_hex": "0123456789ab", "admin_password": "違うパスワード"},
+            )
+            assert response.status_code == 401
+
     def test_delete_user_not_found(self, test_client: TestClient) -> None:
         """ユーザーが見つからない場合はsuccessがFalse。"""
         with (
@@ -10,20 +10,16 @@ from fastapi.testclient import TestClient
 
 
 @pytest.fixture
-def temp_csv_file() -> Generator[Path, None, None]:
-    """一時的なCSVファイルを作成するフィクスチャ。"""
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".csv", delete=False, encoding="utf-8"
-    ) as f:
+def temp_csv_file(tmp_path: Path) -> Path:
+    """一時的なCSVファイルを作成するフィクスチャ。
+
+    ロックファイルなどの付随ファイルも含め、テスト終了後にpytestが削除する。
+    """
+    temp_path = tmp_path / "users.csv"
+    with open(temp_path, "w", encoding="utf-8") as f:
         f.write("uid_hex,id,name,email,role,description\n")
         f.write("0123456789ab,user001,テストユーザー,test@example.com,admin,テスト用\n")
-        temp_path = Path(f.name)
-
-    yield temp_path
-
-    # クリーンアップ
-    if temp_path.exists():
-        temp_path.unlink()
+    return temp_path
 
 
 @pytest.fixture
@@ -38,6 +34,7 @@ def mock_settings(temp_csv_file: Path) -> Generator[None, None, None]:
         mock_settings.admin_password = "test_password"
         mock_settings.debug_mode = True
         mock_settings.nfc_device_path = "usb:054c:06c1"
+        mock_settings.server_workers = 1
         yield
 
 
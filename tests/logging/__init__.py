@@ -0,0 +1 @@
+"""ロギングテストパッケージ。"""
@@ -0,0 +1,97 @@
+"""ロガーのテスト。"""
+
+import logging
+from logging.handlers import QueueHandler
+from pathlib import Path
+from unittest.mock import patch
+
+
+class _CollectingHandler(logging.Handler):
+    """受け取ったログレコードを保持するハンドラ。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+class TestLogger:
+    """get_loggerとログ出力スレッドのテスト。"""
+
+    def test_get_logger_uses_queue_handler(self) -> None:
+        """ロガーにはキューハンドラのみが設定される。"""
+        from src.logging.logger import get_logger
+
+        logger = get_logger("tests.logging.queue_handler")
+
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], QueueHandler)
+
+    def test_loggers_share_queue_handler(self) -> None:
+        """全ロガーで同じキューハンドラを共有する。"""
+        from src.logging.logger import get_logger
+
+        first = get_logger("tests.logging.shared_a")
+        second = get_logger("tests.logging.shared_b")
+
+        assert first.handlers[0] is second.handlers[0]
+
+    def test_queued_records_flushed_by_listener(self) -> None:
+        """停止中に記録したログも、リスナー開始後に出力ハンドラへ渡される。"""
+        from src.logging import logger as logger_module
+
+        collector = _CollectingHandler()
+        logger = logger_module.get_logger("tests.logging.flush")
+
+        logger_module.stop_log_listener()
+        try:
+            with patch.object(
+                logger_module, "_get_output_handlers", return_value=(collector,)
+            ):
+                logger.warning("queued while stopped")
+                logger_module.start_log_listener()
+                logger_module.stop_log_listener()
+        finally:
+            logger_module.start_log_listener()
+
+        messages = [
+            r.getMessage() for r in collector.records if r.name == "tests.logging.flush"
+        ]
+        assert messages == ["queued while stopped"]
+
+
+class TestLogFileSlot:
+    """プロセスごとのログファイル名のテスト。"""
+
+    def test_single_worker_uses_app_log(self, tmp_path: Path) -> None:
+        """ワーカーが1つの場合はロックを取らずapp.logに出力する。"""
+        from src.logging.logger import _LogFileSlot
+
+        with patch("src.logging.logger.get_settings") as mock:
+            mock.return_value.server_workers = 1
+            assert _LogFileSlot._acquire(tmp_path) == "app.log"
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_workers_use_separate_log_files(self, tmp_path: Path) -> None:
+        """複数ワーカー構成では、使用中の番号を避けたログファイル名になる。"""
+        from src.config.process_lock import try_lock_file, unlock_file
+        from src.logging.logger import _LogFileSlot
+
+        # 親プロセスが番号0を使用している状態
+        other = try_lock_file(tmp_path / ".app-0.lock")
+        assert other is not None
+        try:
+            with (
+                patch("src.logging.logger.get_settings") as mock,
+                patch.object(_LogFileSlot, "_lock_file", None),
+            ):
+                mock.return_value.server_workers = 2
+                assert _LogFileSlot._acquire(tmp_path) == "app-1.log"
+                held = _LogFileSlot._lock_file
+                assert held is not None
+                unlock_file(held)
+        finally:
+            unlock_file(other)
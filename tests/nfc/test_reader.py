@@ -1,6 +1,9 @@
 """NFCリーダーのテスト。"""
 
-from unittest.mock import patch
+import sys
+import threading
+from types import ModuleType, SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -37,6 +40,33 @@ class TestNFCReader:
         assert reader1 is reader2
         assert reader2 is reader3
 
+    def test_acquire_device_only_one_owner(self, mock_settings, tmp_path) -> None:
+        """リーダーの担当は、ロックファイルを取得できたプロセスだけになる。"""
+        from src.config.process_lock import try_lock_file, unlock_file
+        from src.nfc.reader import NFC_OWNER_LOCK_NAME, get_nfc_reader
+
+        mock_settings.return_value.user_data_csv_path = tmp_path / "users.csv"
+        reader = get_nfc_reader()
+
+        # 他のワーカープロセスが担当している状態
+        other = try_lock_file(tmp_path / NFC_OWNER_LOCK_NAME)
+        assert other is not None
+        try:
+            assert reader.acquire_device() is False
+            assert reader.is_device_owner is False
+        finally:
+            unlock_file(other)
+
+        assert reader.acquire_device() is True
+        assert reader.is_device_owner is True
+
+        # 解放後は他のプロセスが担当になれる
+        reader.close()
+        assert reader.is_device_owner is False
+        other = try_lock_file(tmp_path / NFC_OWNER_LOCK_NAME)
+        assert other is not None
+        unlock_file(other)
+
     def test_read_single_debug_mode(self, mock_settings) -> None:
         """デバッグモードではダミーUIDが返される。"""
         from src.nfc.reader import get_nfc_reader
@@ -75,6 +105,26 @@ class TestNFCReader:
         result = reader.stop_continuous_mode()
         assert result is False
 
+    def test_stop_continuous_mode_does_not_wait_for_interval(
+        self, mock_settings
+    ) -> None:
+        """停止要求はスキャン間隔の待機を待たずに反映される。"""
+        import time
+
+        from src.nfc.reader import CONTINUOUS_SCAN_INTERVAL, get_nfc_reader
+
+        reader = get_nfc_reader()
+        reader.start_continuous_mode()
+        scan_thread = reader._scan_thread
+
+        started = time.monotonic()
+        reader.stop_continuous_mode()
+        elapsed = time.monotonic() - started
+
+        assert scan_thread is not None
+        assert not scan_thread.is_alive()
+        assert elapsed < CONTINUOUS_SCAN_INTERVAL
+
     def test_get_results_and_reset(self, mock_settings) -> None:
         """結果取得とリセット。"""
         from src.nfc.reader import get_nfc_reader
@@ -109,6 +159,41 @@ class TestNFCReader:
         results = reader.get_results_and_reset()
         assert results == ["uid2", "uid3", "uid4", "uid5", "uid6"]
 
+    def test_continuous_scan_loop_records_new_cards(self, mock_settings) -> None:
+        """読み取りループは連続する重複を除いてバッファに蓄積する。"""
+        from src.nfc.reader import get_nfc_reader
+
+        reader = get_nfc_reader()
+        uids = iter(["uid1", "uid1", "uid2"])
+
+        def fake_read_single(
+            timeout: float, cancel_event: threading.Event | None = None
+        ) -> str | None:
+            uid = next(uids, None)
+            if uid is None:
+                reader._stop_event.set()
+            return uid
+
+        with (
+            patch("src.nfc.reader.CONTINUOUS_SCAN_INTERVAL", 0),
+            patch.object(reader, "read_single", side_effect=fake_read_single),
+        ):
+            reader._continuous_scan_loop()
+
+        assert reader.get_results_and_reset() == ["uid1", "uid2"]
+
+    def test_reset_keeps_buffer_limit(self, mock_settings) -> None:
+        """リセット後のバッファも上限を維持する。"""
+        from src.nfc.reader import get_nfc_reader
+
+        reader = get_nfc_reader()
+        reader.get_results_and_reset()
+
+        for i in range(7):
+            reader._scan_buffer.append(f"uid{i}")
+
+        assert reader.buffer_size == 5
+
     def test_duplicate_card_ignored(self, mock_settings) -> None:
         """連続して同じカードは無視される。"""
         from src.nfc.reader import get_nfc_reader
@@ -176,3 +261,82 @@ class TestNFCReaderWithPCSC:
             with patch.object(reader, "_read_card_pcsc", return_value=None):
                 result = reader.read_single()
                 assert result is None
+
+    @pytest.fixture
+    def pcsc_reader(self):
+        """デバッグモード無効のリーダー。"""
+        with patch("src.nfc.reader.get_settings") as mock_settings:
+            mock_settings.return_value.debug_mode = False
+            mock_settings.return_value.max_scan_buffer_size = 10
+            mock_settings.return_value.nfc_device_path = "usb:054c:0dc8"
+
+            from src.nfc.reader import get_nfc_reader
+
+            yield get_nfc_reader()
+
+    @pytest.fixture
+    def mock_card_request(self):
+        """pyscardモジュールをモックし、CardRequestクラスのモックを返す。"""
+        card_request_cls = MagicMock()
+        connection = card_request_cls.return_value.waitforcard.return_value.connection
+        connection.transmit.return_value = (
+            [0x01, 0x23, 0x45, 0x67, 0x89, 0xAB],
+            0x90,
+            0x00,
+        )
+
+        timeout_exception = type("CardRequestTimeoutException", (Exception,), {})
+        modules = {
+            "smartcard": ModuleType("smartcard"),
+            "smartcard.CardRequest": SimpleNamespace(CardRequest=card_request_cls),
+            "smartcard.CardType": SimpleNamespace(AnyCardType=MagicMock()),
+            "smartcard.Exceptions": SimpleNamespace(
+                CardRequestTimeoutException=timeout_exception
+            ),
+            "smartcard.util": SimpleNamespace(
+                toHexString=lambda data: " ".join(f"{b:02X}" for b in data)
+            ),
+        }
+        with patch.dict(sys.modules, modules):
+            yield card_request_cls
+
+    def test_read_card_pcsc_reuses_card_request(
+        self, pcsc_reader, mock_card_request
+    ) -> None:
+        """CardRequestは読み取りのたびに生成せず使い回す。"""
+        assert pcsc_reader.read_single() == "0123456789ab"
+        assert pcsc_reader.read_single() == "0123456789ab"
+
+        assert mock_card_request.call_count == 1
+
+    def test_close_releases_card_request(self, pcsc_reader, mock_card_request) -> None:
+        """close後の読み取りではCardRequestを再生成する。"""
+        pcsc_reader.read_single()
+        pcsc_reader.close()
+        pcsc_reader.read_single()
+
+        assert mock_card_request.call_count == 2
+
+    def test_read_card_pcsc_polls_until_card_detected(
+        self, pcsc_reader, mock_card_request
+    ) -> None:
+        """カードが検出されるまで短い間隔でポーリングする。"""
+        from smartcard.Exceptions import CardRequestTimeoutException
+
+        service = mock_card_request.return_value.waitforcard.return_value
+        mock_card_request.return_value.waitforcard.side_effect = [
+            CardRequestTimeoutException(),
+            CardRequestTimeoutException(),
+            service,
+        ]
+
+        assert pcsc_reader.read_single() == "0123456789ab"
+        assert mock_card_request.return_value.waitforcard.call_count == 3
+
+    def test_read_card_pcsc_cancelled(self, pcsc_reader, mock_card_request) -> None:
+        """キャンセルイベントがセットされている場合は待ち受けずにNoneを返す。"""
+        cancel_event = threading.Event()
+        cancel_event.set()
+
+        assert pcsc_reader.read_single(cancel_event=cancel_event) is None
+        mock_card_request.return_value.waitforcard.assert_not_called()
@@ -1,5 +1,6 @@
 """ユーザーサービスのテスト。"""
 
+import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -9,21 +10,30 @@ import pytest
 from src.schemas.models import UserData
 
 
+@pytest.fixture(autouse=True)
+def reset_path_cache():
+    """確認済みCSVパスのキャッシュをテストごとに破棄する。"""
+    from src.services.user_service import _reset_path_cache
+
+    _reset_path_cache()
+    yield
+    _reset_path_cache()
+
+
 class TestUserService:
     """ユーザーサービスのテスト。"""
 
     @pytest.fixture
-    def temp_csv(self) -> Path:
-        """一時CSVファイルを作成。"""
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".csv", delete=False, encoding="utf-8"
-        ) as f:
+    def temp_csv(self, tmp_path: Path) -> Path:
+        """一時CSVファイルを作成（テスト終了後にpytestが削除する）。"""
+        csv_path = tmp_path / "users.csv"
+        with open(csv_path, "w", encoding="utf-8") as f:
             f.write("uid_hex,id,name,email,role,description\n")
             f.write(
                 "0123456789ab,user001,テストユーザー,test@example.com,admin,テスト用\n"
             )
             f.write("abcdef123456,user002,ユーザー2,user2@example.com,user,説明2\n")
-            return Path(f.name)
+        return csv_path
 
     @pytest.fixture
     def mock_csv_path(self, temp_csv: Path):
@@ -57,6 +67,114 @@ class TestUserService:
         result = lookup_user("nonexistent123")
         assert result is None
 
+    def test_lookup_user_uses_index(self, mock_csv_path: Path) -> None:
+        """CSVファイルが変更されない限り索引を再構築しない。"""
+        from src.services import user_service
+
+        with patch.object(
+            user_service, "_load_users", wraps=user_service._load_users
+        ) as spy:
+            first = user_service.lookup_user("0123456789ab")
+            second = user_service.lookup_user("abcdef123456")
+            missing = user_service.lookup_user("nonexistent123")
+
+        assert first is not None
+        assert second is not None
+        assert missing is None
+        assert spy.call_count == 1
+
+    def test_lookup_user_reloads_after_external_edit(self, mock_csv_path: Path) -> None:
+        """CSVファイルが外部で更新された場合は索引を再構築する。"""
+        import os
+
+        from src.services.user_service import lookup_user
+
+        assert lookup_user("fedcba987654") is None
+
+        stat = mock_csv_path.stat()
+        with open(mock_csv_path, "a", encoding="utf-8") as f:
+            f.write("fedcba987654,user004,外部追加,,,\n")
+        os.utime(mock_csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = lookup_user("fedcba987654")
+        assert result is not None
+        assert result.name == "外部追加"
+
+    def test_lookup_cache_invalidated_on_register(self, mock_csv_path: Path) -> None:
+        """未登録としてキャッシュされたUIDも登録後は見つかる。"""
+        from src.services.user_service import lookup_user, register_user
+
+        assert lookup_user("newuser12345") is None
+
+        register_user(UserData(uid_hex="newuser12345", id="user003", name="新規"))
+
+        result = lookup_user("newuser12345")
+        assert result is not None
+        assert result.name == "新規"
+
+    def test_lookup_user_reloads_when_size_changes(self, mock_csv_path: Path) -> None:
+        """更新時刻が同じでもサイズが変われば索引を再構築する。"""
+        import os
+
+        from src.services.user_service import lookup_user
+
+        assert lookup_user("fedcba987654") is None
+
+        stat = mock_csv_path.stat()
+        with open(mock_csv_path, "a", encoding="utf-8") as f:
+            f.write("fedcba987654,user004,外部追加,,,\n")
+        os.utime(mock_csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert lookup_user("fedcba987654") is not None
+
+    def test_lookup_user_reloads_after_same_size_replace(
+        self, mock_csv_path: Path
+    ) -> None:
+        """更新時刻とサイズが同じでもファイルが置き換えられれば索引を再構築する。"""
+        import os
+
+        from src.services.user_service import lookup_user
+
+        result = lookup_user("0123456789ab")
+        assert result is not None
+        assert result.role == "admin"
+
+        # 他ワーカーによる同サイズの書き換え（admin → guest）を再現する
+        stat = mock_csv_path.stat()
+        content = mock_csv_path.read_text(encoding="utf-8")
+        replacement = mock_csv_path.with_name("replacement.csv")
+        replacement.write_text(content.replace(",admin,", ",guest,"), encoding="utf-8")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, mock_csv_path)
+        assert mock_csv_path.stat().st_size == stat.st_size
+
+        result = lookup_user("0123456789ab")
+        assert result is not None
+        assert result.role == "guest"
+
+    def test_lookup_user_reordered_and_short_rows(self, mock_csv_path: Path) -> None:
+        """列順が異なるCSVや列が欠けた行も読み込める。"""
+        from src.services.user_service import get_all_users, lookup_user
+
+        mock_csv_path.write_text(
+            "name,uid_hex,id\n"
+            "ユーザーA,aaaa0001,user_a\n"
+            "\n"
+            "ユーザーB,bbbb0002\n",
+            encoding="utf-8",
+        )
+
+        user_a = lookup_user("aaaa0001")
+        assert user_a is not None
+        assert user_a.id == "user_a"
+        assert user_a.name == "ユーザーA"
+        assert user_a.email == ""
+
+        user_b = lookup_user("bbbb0002")
+        assert user_b is not None
+        assert user_b.id == ""
+        assert len(get_all_users()) == 2
+
     def test_register_user_new(self, mock_csv_path: Path) -> None:
         """新規ユーザーを登録できる。"""
         from src.services.user_service import lookup_user, register_user
@@ -78,6 +196,226 @@ class TestUserService:
         assert result is not None
         assert result.name == "新規ユーザー"
 
+    def test_register_user_new_appends_row(self, mock_csv_path: Path) -> None:
+        """新規登録はファイル全体を書き換えず末尾に追記する。"""
+        from src.services import user_service
+
+        with patch.object(user_service, "_rewrite_users") as mock_write:
+            user_service.register_user(
+                UserData(uid_hex="newuser12345", id="user003", name="新規")
+            )
+
+        mock_write.assert_not_called()
+        lines = mock_csv_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 4
+        assert lines[-1] == "newuser12345,user003,新規,,,"
+
+    def test_register_user_appends_after_missing_newline(
+        self, mock_csv_path: Path
+    ) -> None:
+        """末尾に改行がないCSVでも既存行と連結せずに追記する。"""
+        from src.services.user_service import get_all_users, register_user
+
+        content = mock_csv_path.read_text(encoding="utf-8").rstrip("\n")
+        mock_csv_path.write_text(content, encoding="utf-8")
+
+        register_user(UserData(uid_hex="newuser12345", id="user003", name="新規"))
+
+        users = get_all_users()
+        assert [u.uid_hex for u in users] == [
+            "0123456789ab",
+            "abcdef123456",
+            "newuser12345",
+        ]
+        assert users[1].description == "説明2"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="fcntlを使用")
+    def test_register_user_holds_file_lock(self, mock_csv_path: Path) -> None:
+        """書き込み中は他プロセス向けのファイルロックを保持する。"""
+        import fcntl
+
+        from src.services import user_service
+
+        lock_path = mock_csv_path.with_name(mock_csv_path.name + ".lock")
+        locked_during_write: list[bool] = []
+
+        def fake_append(csv_path: Path, user: UserData, header: list[str]) -> None:
+            with open(lock_path, "a+b") as f:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    locked_during_write.append(True)
+                else:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    locked_during_write.append(False)
+
+        with patch.object(user_service, "_append_user", side_effect=fake_append):
+            user_service.register_user(
+                UserData(uid_hex="newuser12345", id="user003", name="新規")
+            )
+
+        assert locked_during_write == [True]
+
+        # 書き込み後はロックが解放されている
+        with open(lock_path, "a+b") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def test_register_user_into_reordered_header(self, mock_csv_path: Path) -> None:
+        """列順が異なるCSVへの新規登録も、再読み込み後に正しく検索できる。"""
+        from src.services.user_service import _user_index, lookup_user, register_user
+
+        mock_csv_path.write_text(
+            "id,uid_hex,name,email,role,description\nU1,aa,ユーザーA,,,\n",
+            encoding="utf-8",
+        )
+
+        register_user(UserData(uid_hex="bb", id="U2", name="ユーザーB"))
+        _user_index.invalidate()
+
+        user_b = lookup_user("bb")
+        assert user_b is not None
+        assert user_b.id == "U2"
+        assert lookup_user("U2") is None
+        user_a = lookup_user("aa")
+        assert user_a is not None
+        assert user_a.id == "U1"
+
+        lines = mock_csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines == [
+            "id,uid_hex,name,email,role,description",
+            "U1,aa,ユーザーA,,,",
+            "U2,bb,ユーザーB,,,",
+        ]
+
+    def test_register_user_into_csv_with_bom(self, mock_csv_path: Path) -> None:
+        """BOM付きCSV（Excelの「CSV UTF-8」）への登録で既存ユーザーを失わない。"""
+        from src.services.user_service import (
+            _user_index,
+            get_all_users,
+            lookup_user,
+            register_user,
+        )
+
+        mock_csv_path.write_text(
+            "\ufeffuid_hex,id,name,email,role,description\n"
+            "aa,1,A,,,\n"
+            "bb,2,B,,,\n"
+            "cc,3,C,,,\n",
+            encoding="utf-8",
+        )
+
+        register_user(UserData(uid_hex="dd", id="4", name="D"))
+        register_user(UserData(uid_hex="aa", id="1", name="A2"))
+        _user_index.invalidate()
+
+        assert [u.uid_hex for u in get_all_users()] == ["aa", "bb", "cc", "dd"]
+        result = lookup_user("aa")
+        assert result is not None
+        assert result.name == "A2"
+        # Excelで開けるようBOMは維持される
+        assert mock_csv_path.read_bytes().startswith(b"\xef\xbb\xbfuid_hex,")
+
+    def test_register_user_keeps_extra_columns(self, mock_csv_path: Path) -> None:
+        """CSV_HEADERSにない列は登録・更新・削除後も保持される。"""
+        from src.services.user_service import delete_user, register_user
+
+        mock_csv_path.write_text(
+            "uid_hex,id,name,department,email,role,description\n"
+            "aa,1,A,営業,,,\n"
+            "bb,2,B,開発,,,\n",
+            encoding="utf-8",
+        )
+
+        register_user(UserData(uid_hex="cc", id="3", name="C"))
+        register_user(UserData(uid_hex="aa", id="1", name="A2"))
+        delete_user("bb")
+
+        lines = mock_csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines == [
+            "uid_hex,id,name,department,email,role,description",
+            "aa,1,A2,営業,,,",
+            "cc,3,C,,,,",
+        ]
+
+    def test_missing_uid_column_raises(self, mock_csv_path: Path) -> None:
+        """UID列のないCSVは読み込まず、書き換えもしない。"""
+        from src.services.user_service import lookup_user, register_user
+
+        content = "id,name\n1,A\n2,B\n"
+        mock_csv_path.write_text(content, encoding="utf-8")
+
+        with pytest.raises(ValueError, match="uid_hex"):
+            lookup_user("aa")
+        with pytest.raises(ValueError, match="uid_hex"):
+            register_user(UserData(uid_hex="dd", id="4", name="D"))
+
+        assert mock_csv_path.read_text(encoding="utf-8") == content
+
+    def test_register_user_stores_lowercase_uid(self, mock_csv_path: Path) -> None:
+        """UIDは小文字に正規化して保存される。"""
+        from src.services.user_service import lookup_user, register_user
+
+        register_user(UserData(uid_hex="NEWUSER12345", id="user003", name="新規"))
+
+        lines = mock_csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines[-1] == "newuser12345,user003,新規,,,"
+        result = lookup_user("newuser12345")
+        assert result is not None
+        assert result.uid_hex == "newuser12345"
+
+    def test_register_user_failed_write_keeps_index(self, mock_csv_path: Path) -> None:
+        """書き込みに失敗したユーザーは索引に残らない。"""
+        from src.services.user_service import lookup_user, register_user
+
+        # サロゲート文字はUTF-8に変換できず書き込み時に例外となる
+        with pytest.raises(UnicodeEncodeError):
+            register_user(UserData(uid_hex="cc", id="user003", name="\ud800"))
+        assert lookup_user("cc") is None
+
+        with pytest.raises(UnicodeEncodeError):
+            register_user(UserData(uid_hex="0123456789ab", id="user001", name="\ud800"))
+        result = lookup_user("0123456789ab")
+        assert result is not None
+        assert result.name == "テストユーザー"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="fcntlを使用")
+    def test_lookup_not_blocked_by_waiting_writer(self, mock_csv_path: Path) -> None:
+        """他ワーカーの書き込み待ちの間も検索は待たされない。"""
+        import fcntl
+        import threading
+
+        from src.services.user_service import lookup_user, register_user
+
+        assert lookup_user("0123456789ab") is not None
+
+        lock_path = mock_csv_path.with_name(mock_csv_path.name + ".lock")
+        with open(lock_path, "a+b") as f:
+            # 他ワーカーが書き込み中の状態を再現する
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            writer = threading.Thread(
+                target=register_user,
+                args=(UserData(uid_hex="newuser12345", id="user003", name="新規"),),
+            )
+            writer.start()
+            writer.join(timeout=0.1)
+            assert writer.is_alive()
+
+            results: list[UserData | None] = []
+            reader = threading.Thread(
+                target=lambda: results.append(lookup_user("0123456789ab"))
+            )
+            reader.start()
+            reader.join(timeout=2.0)
+            blocked = reader.is_alive()
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+        writer.join(timeout=2.0)
+        reader.join(timeout=2.0)
+        assert not blocked
+        assert results and results[0] is not None
+        assert lookup_user("newuser12345") is not None
+
     def test_register_user_update(self, mock_csv_path: Path) -> None:
         """既存ユーザーを上書き更新できる。"""
         from src.services.user_service import lookup_user, register_user
@@ -120,6 +458,67 @@ class TestUserService:
         result = delete_user("nonexistent123")
         assert result is False
 
+    def test_delete_user_keeps_other_duplicate_rows(self, mock_csv_path: Path) -> None:
+        """削除対象以外の行は手動で追加された重複行も含めてそのまま残す。"""
+        from src.services.user_service import delete_user, register_user
+
+        mock_csv_path.write_text(
+            "uid_hex,id,name,email,role,description\n"
+            "aa,1,A,,,\n"
+            "AA,2,A2,,,\n"
+            "bb,3,B,,,\n",
+            encoding="utf-8",
+        )
+
+        assert delete_user("bb") is True
+        lines = mock_csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines[1:] == ["aa,1,A,,,", "AA,2,A2,,,"]
+
+        register_user(UserData(uid_hex="cc", id="4", name="C"))
+        assert register_user(UserData(uid_hex="cc", id="5", name="C2")) is True
+        lines = mock_csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines[1:] == ["aa,1,A,,,", "AA,2,A2,,,", "cc,5,C2,,,"]
+
+    def test_delete_user_syncs_before_replace(self, mock_csv_path: Path) -> None:
+        """一時ファイルをディスクへ同期してから置き換える。"""
+        import os
+
+        from src.services.user_service import delete_user
+
+        calls: list[str] = []
+        real_replace = os.replace
+
+        def fake_replace(src, dst) -> None:
+            calls.append("replace")
+            real_replace(src, dst)
+
+        with (
+            patch(
+                "src.services.user_service.os.fsync",
+                side_effect=lambda fd: calls.append("fsync"),
+            ),
+            patch("src.services.user_service.os.replace", side_effect=fake_replace),
+        ):
+            assert delete_user("0123456789ab") is True
+
+        assert calls == ["fsync", "replace"]
+
+    def test_delete_user_failed_write_keeps_file(self, mock_csv_path: Path) -> None:
+        """書き換えに失敗しても元のCSVと索引は変更されない。"""
+        from src.services.user_service import delete_user, lookup_user
+
+        original = mock_csv_path.read_bytes()
+
+        with (
+            patch("src.services.user_service.os.replace", side_effect=OSError),
+            pytest.raises(OSError),
+        ):
+            delete_user("0123456789ab")
+
+        assert mock_csv_path.read_bytes() == original
+        assert not mock_csv_path.with_name(mock_csv_path.name + ".tmp").exists()
+        assert lookup_user("0123456789ab") is not None
+
     def test_get_all_users(self, mock_csv_path: Path) -> None:
         """全ユーザーを取得できる。"""
         from src.services.user_service import get_all_users
@@ -129,6 +528,22 @@ class TestUserService:
         assert users[0].uid_hex == "0123456789ab"
         assert users[1].uid_hex == "abcdef123456"
 
+    def test_get_all_users_uses_index(self, mock_csv_path: Path) -> None:
+        """全件取得も索引から返し、登録内容が反映される。"""
+        from src.services import user_service
+
+        with patch.object(
+            user_service, "_load_users", wraps=user_service._load_users
+        ) as spy:
+            user_service.lookup_user("0123456789ab")
+            user_service.register_user(
+                UserData(uid_hex="newuser12345", id="user003", name="新規")
+            )
+            users = user_service.get_all_users()
+
+        assert [u.uid_hex for u in users][-1] == "newuser12345"
+        assert spy.call_count == 1
+
 
 class TestCsvTemplateCreation:
     """CSVテンプレート自動生成のテスト。"""
@@ -152,3 +567,102 @@ class TestCsvTemplateCreation:
                 with open(csv_path, encoding="utf-8") as f:
                     header = f.readline().strip()
                     assert header == "uid_hex,id,name,email,role,description"
+
+    def test_ensure_csv_file_writes_header_to_empty_file(self, tmp_path: Path) -> None:
+        """空のCSVファイルにはヘッダーを書き込む。"""
+        csv_path = tmp_path / "users.csv"
+        csv_path.touch()
+
+        with patch("src.services.user_service.get_settings") as mock:
+            mock.return_value.user_data_csv_path = csv_path
+
+            from src.services.user_service import _ensure_csv_file, register_user
+
+            _ensure_csv_file()
+            register_user(UserData(uid_hex="newuser12345", id="user003", name="新規"))
+
+        lines = csv_path.read_text(encoding="utf-8").splitlines()
+        assert lines == [
+            "uid_hex,id,name,email,role,description",
+            "newuser12345,user003,新規,,,",
+        ]
+
+    def test_lookup_user_recreates_deleted_csv(self, tmp_path: Path) -> None:
+        """確認済みのCSVファイルが削除されてもテンプレートを再作成する。"""
+        csv_path = tmp_path / "data" / "users.csv"
+
+        with patch("src.services.user_service.get_settings") as mock:
+            mock.return_value.user_data_csv_path = csv_path
+
+            from src.services.user_service import lookup_user
+
+            assert lookup_user("0123456789ab") is None
+            csv_path.unlink()
+
+            assert lookup_user("0123456789ab") is None
+
+        header = csv_path.read_text(encoding="utf-8").strip()
+        assert header == "uid_hex,id,name,email,role,description"
+
+    def test_register_user_recreate_race_does_not_relock(self, tmp_path: Path) -> None:
+        """ロック保持中にCSVの再作成が競合しても、ロックを二重に取得しない。"""
+        from contextlib import contextmanager
+
+        from src.services import user_service
+
+        csv_path = tmp_path / "users.csv"
+        real_file_lock = user_service._file_lock
+        real_signature = user_service._file_signature
+        depth = 0
+        raced = False
+
+        @contextmanager
+        def guarded_file_lock(path: Path):
+            nonlocal depth
+            assert depth == 0, "file lock acquired twice"
+            depth += 1
+            try:
+                with real_file_lock(path):
+                    yield
+            finally:
+                depth -= 1
+
+        def racing_signature(path: Path):
+            # ロック保持中のstat()直後に他ワーカーがCSVを再作成した状況を再現する
+            nonlocal raced
+            if depth and not raced:
+                raced = True
+                raise FileNotFoundError(path)
+            return real_signature(path)
+
+        with (
+            patch("src.services.user_service.get_settings") as mock,
+            patch.object(user_service, "_file_lock", guarded_file_lock),
+            patch.object(user_service, "_file_signature", racing_signature),
+        ):
+            mock.return_value.user_data_csv_path = csv_path
+            user_service._user_index.invalidate()
+
+            user_service.register_user(
+                UserData(uid_hex="newuser12345", id="user003", name="新規")
+            )
+
+            assert raced
+            assert user_service.lookup_user("newuser12345") is not None
+
+    def test_ensure_csv_file_checks_once_per_path(self) -> None:
+        """確認済みのパスではディレクトリ作成・存在確認を繰り返さない。"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = Path(temp_dir) / "data" / "users.csv"
+
+            with patch("src.services.user_service.get_settings") as mock:
+                mock.return_value.user_data_csv_path = csv_path
+
+                from src.services.user_service import _ensure_csv_file
+
+                assert _ensure_csv_file() == csv_path
+
+                with patch.object(Path, "mkdir") as mock_mkdir:
+                    assert _ensure_csv_file() == csv_path
+
+                mock_mkdir.assert_not_called()
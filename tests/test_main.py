@@ -0,0 +1,94 @@
+"""エントリーポイントのテスト。"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+class TestMain:
+    """main関数のテスト。"""
+
+    @pytest.fixture(autouse=True)
+    def real_settings(self):
+        """他テストのモックに依存しないよう、実際の設定を使用する。"""
+        import main
+        from src.config.settings import Settings
+
+        with patch.object(main, "settings", Settings()):
+            yield
+
+    def test_main_uses_fast_loop_and_http_parser(self) -> None:
+        """Uvicornにイベントループ実装とHTTPパーサーを明示的に渡す。"""
+        import main
+
+        with patch("main.uvicorn.run") as mock_run:
+            main.main()
+
+        kwargs = mock_run.call_args.kwargs
+        assert kwargs["loop"] == main.UVICORN_LOOP
+        assert kwargs["http"] == "httptools"
+
+    def test_main_disables_access_log_by_default(self) -> None:
+        """アクセスログはデフォルトで無効。"""
+        import main
+
+        with patch("main.uvicorn.run") as mock_run:
+            main.main()
+
+        assert mock_run.call_args.kwargs["access_log"] is False
+
+    def test_main_passes_worker_count(self) -> None:
+        """設定したワーカー数がUvicornに渡される。"""
+        import main
+
+        with (
+            patch("main.uvicorn.run") as mock_run,
+            patch.object(main.settings, "server_workers", 4),
+        ):
+            main.main()
+
+        assert mock_run.call_args.kwargs["workers"] == 4
+
+
+class TestLifespan:
+    """アプリケーションのライフサイクルのテスト。"""
+
+    def test_startup_loads_user_index(self, mock_settings: None) -> None:
+        """起動時にユーザー索引を構築する。"""
+        from fastapi.testclient import TestClient
+
+        import main
+
+        with (
+            patch("main.get_all_users", return_value=[]) as mock_load,
+            TestClient(main.app),
+        ):
+            mock_load.assert_called_once_with()
+
+    def test_startup_continues_when_user_index_fails(self, mock_settings: None) -> None:
+        """ユーザー索引の読み込みに失敗しても起動し、NFC機能は利用できる。"""
+        from fastapi.testclient import TestClient
+
+        import main
+
+        error = UnicodeDecodeError("utf-8", b"\x83", 0, 1, "invalid start byte")
+        with (
+            patch("main.get_all_users", side_effect=error),
+            TestClient(main.app) as client,
+        ):
+            response = client.get("/read")
+
+        assert response.status_code == 200
+
+    def test_startup_fails_on_unexpected_error(self, mock_settings: None) -> None:
+        """CSVの読み込み失敗以外の例外では起動を中止する。"""
+        from fastapi.testclient import TestClient
+
+        import main
+
+        with (
+            patch("main.get_all_users", side_effect=RuntimeError("bug")),
+            pytest.raises(RuntimeError),
+            TestClient(main.app),
+        ):
+            pass